@@ -8,92 +8,156 @@ Author: [Siddharta Adaikalaraj]
 Date: [06/10/2025]
 """
 
-import pandas as pd
-import seaborn as sns
+import os
+
+import numpy as np
+import matplotlib
+
+# Render off-screen; figures are written to disk rather than shown
+matplotlib.use("Agg")
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+
+from table_io import read_table
 
 
 # ---------------------------------------------------------------------------
-# Helper: set consistent plot style
+# Helpers: consistent plot style, reference lines and figure output
 # ---------------------------------------------------------------------------
-sns.set_style("whitegrid")
+_sns = None
+
+
+def _use_plot_style() -> None:
+    """Import seaborn on first use and apply the shared whitegrid style."""
+    global _sns
+    if _sns is None:
+        import seaborn as sns
+        sns.set_style("whitegrid")
+        _sns = sns
+
+
+def _save_figure(fig, out_path: str) -> None:
+    """Write ``fig`` to ``out_path`` and release its canvas."""
+    fig.savefig(out_path, dpi=100, bbox_inches="tight")
+    plt.close(fig)
+
+
+def _suffixed(out_path: str, suffix: str) -> str:
+    """Insert ``_suffix`` before the extension of ``out_path``."""
+    root, ext = os.path.splitext(out_path)
+    return f"{root}_{suffix}{ext}"
+
+
+def _hline_collection(ax, ys, linewidth: float) -> LineCollection:
+    """Dashed full-width reference lines at ``ys``, drawn as a single artist."""
+    return LineCollection(
+        [[(0, y), (1, y)] for y in ys],
+        transform=ax.get_yaxis_transform(),
+        colors="gray",
+        linestyles="--",
+        linewidths=linewidth,
+        alpha=0.7,
+    )
 
 
 # ---------------------------------------------------------------------------
 # 1. Hydrogen Demand by Region
 # ---------------------------------------------------------------------------
-def plot_demand_by_region(filepath: str) -> None:
-    """Visualize hydrogen demand share by region (bar, pie, and trend charts)."""
-    df = pd.read_csv(filepath)
+def plot_demand_by_region(filepath: str, out_path: str) -> None:
+    """
+    Visualize hydrogen demand share by region (bar, pie, and trend charts).
+    Each chart is saved next to ``out_path`` with a _bar/_pie/_area/_trend suffix.
+    """
+    _use_plot_style()
+    df = read_table(
+        filepath,
+        engine="pyarrow",
+        usecols=["year", "region", "share_percent"],
+        dtype={"year": "int16", "region": "category", "share_percent": "float32"},
+    )
     latest_year = df["year"].max()
-    df_latest = df[df["year"] == latest_year]
+    df_latest = df.loc[df["year"].to_numpy() == latest_year].sort_values("share_percent", ascending=False)
+    # Shared by the bar and pie charts; passed positionally, so no index alignment
+    regions = df_latest["region"].to_numpy()
+    shares = df_latest["share_percent"].to_numpy(dtype=np.float32)
 
     # --- Bar Chart ---
-    plt.figure(figsize=(10, 6))
-    sns.barplot(
-        data=df_latest.sort_values("share_percent", ascending=False),
-        x="share_percent",
-        y="region",
-        palette="viridis",
-    )
-    plt.title(f"Hydrogen Demand by Region in {latest_year}")
-    plt.xlabel("Share of Global Demand (%)")
-    plt.ylabel("Region")
-    plt.tight_layout()
-    plt.show()
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.barh(regions, shares, color=plt.cm.viridis(np.linspace(0, 1, len(shares))))
+    ax.invert_yaxis()  # largest share on top
+    ax.grid(False, axis="y")
+    ax.set_title(f"Hydrogen Demand by Region in {latest_year}")
+    ax.set_xlabel("Share of Global Demand (%)")
+    ax.set_ylabel("Region")
+    fig.tight_layout()
+    _save_figure(fig, _suffixed(out_path, "bar"))
 
     # --- Pie Chart ---
-    plt.figure(figsize=(8, 8))
-    plt.pie(
-        df_latest["share_percent"],
-        labels=df_latest["region"],
+    fig, ax = plt.subplots(figsize=(8, 8))
+    ax.pie(
+        shares,
+        labels=regions,
         autopct="%1.1f%%",
         startangle=140,
     )
-    plt.title(f"Hydrogen Demand by Region in {latest_year}")
-    plt.tight_layout()
-    plt.show()
+    ax.set_title(f"Hydrogen Demand by Region in {latest_year}")
+    fig.tight_layout()
+    _save_figure(fig, _suffixed(out_path, "pie"))
+
+    if df["year"].nunique() <= 1:
+        return
+
+    # Pivot once; years missing for a region stay NaN (filled only for the area chart)
+    df_pivot = df.pivot(index="year", columns="region", values="share_percent")
 
     # --- Stacked Area Chart ---
-    if df["year"].nunique() > 1:
-        df_pivot = df.pivot(index="year", columns="region", values="share_percent").fillna(0)
-        df_pivot.plot(kind="area", stacked=True, figsize=(12, 7), alpha=0.8)
-        plt.title("Hydrogen Demand Share by Region Over Time")
-        plt.xlabel("Year")
-        plt.ylabel("Share of Global Demand (%)")
-        plt.legend(title="Region", bbox_to_anchor=(1.05, 1), loc="upper left")
-        plt.tight_layout()
-        plt.show()
+    fig, ax = plt.subplots(figsize=(12, 7))
+    df_pivot.fillna(0).plot(kind="area", stacked=True, ax=ax, alpha=0.8)
+    ax.set_title("Hydrogen Demand Share by Region Over Time")
+    ax.set_xlabel("Year")
+    ax.set_ylabel("Share of Global Demand (%)")
+    ax.legend(title="Region", bbox_to_anchor=(1.05, 1), loc="upper left")
+    fig.tight_layout()
+    _save_figure(fig, _suffixed(out_path, "area"))
 
     # --- Line Chart (Trends) ---
-    if df["year"].nunique() > 1:
-        plt.figure(figsize=(12, 7))
-        sns.lineplot(data=df, x="year", y="share_percent", hue="region", marker="o")
-        plt.title("Regional Trends in Hydrogen Demand Share Over Time")
-        plt.xlabel("Year")
-        plt.ylabel("Share of Global Demand (%)")
-        plt.legend(title="Region", bbox_to_anchor=(1.05, 1), loc="upper left")
-        plt.tight_layout()
-        plt.show()
+    fig, ax = plt.subplots(figsize=(12, 7))
+    # Drop each region's missing years so its line joins the years it does have
+    for region in df_pivot.columns:
+        df_pivot[region].dropna().plot(marker="o", ax=ax, label=region)
+    ax.set_title("Regional Trends in Hydrogen Demand Share Over Time")
+    ax.set_xlabel("Year")
+    ax.set_ylabel("Share of Global Demand (%)")
+    ax.legend(title="Region", bbox_to_anchor=(1.05, 1), loc="upper left")
+    fig.tight_layout()
+    _save_figure(fig, _suffixed(out_path, "trend"))
 
 
 # ---------------------------------------------------------------------------
 # 2. Demand by Sector and Offtake by Region
 # ---------------------------------------------------------------------------
-def plot_demand_sector_and_offtake(sector_file: str, offtake_file: str) -> None:
+def plot_demand_sector_and_offtake(sector_file: str, offtake_file: str, out_path: str) -> None:
     """Compare sectoral demand growth and regional offtake distribution (side-by-side plots)."""
-    df_sector = pd.read_csv(sector_file)
+    _use_plot_style()
+    df_sector = read_table(
+        sector_file,
+        engine="pyarrow",
+        usecols=["year", "sector", "demand (Mtpa H_2)"],
+        dtype={"year": "int16", "demand (Mtpa H_2)": "float32"},
+    )
     df_sector = df_sector[(df_sector["year"] >= 2020) & (df_sector["year"] <= 2025)]
     df_pivot_sector = df_sector.pivot(index="year", columns="sector", values="demand (Mtpa H_2)").fillna(0)
     df_pivot_sector["Total Demand"] = df_pivot_sector.sum(axis=1)
 
-    df_offtake = pd.read_csv(offtake_file)
-    df_pivot_offtake = (
-        df_offtake.pivot(index="role", columns="region", values="share_percent")
-        .fillna(0)
-        .div(df_offtake.groupby("role")["share_percent"].transform("sum"), axis=0)
-        * 100
+    df_offtake = read_table(
+        offtake_file,
+        engine="pyarrow",
+        usecols=["role", "region", "share_percent"],
+        dtype={"share_percent": "float32"},
     )
+    # Normalize each role to 100% from the row totals of the pivot itself
+    df_pivot_offtake = df_offtake.pivot(index="role", columns="region", values="share_percent").fillna(0)
+    df_pivot_offtake = df_pivot_offtake.mul(100.0 / df_pivot_offtake.sum(axis=1).to_numpy(), axis=0)
 
     fig, axes = plt.subplots(1, 2, figsize=(18, 6))
 
@@ -112,76 +176,96 @@ def plot_demand_sector_and_offtake(sector_file: str, offtake_file: str) -> None:
     axes[0].set_title("Hydrogen Demand by Sector (2020–2025)")
     axes[0].set_xlabel("Year")
     axes[0].set_ylabel("Demand (Mtpa H₂)")
-    for y in range(0, int(df_pivot_sector["Total Demand"].max()) + 5, 5):
-        axes[0].axhline(y, color="gray", linestyle="--", linewidth=0.7, alpha=0.7)
+    axes[0].add_collection(
+        _hline_collection(axes[0], np.arange(0, int(df_pivot_sector["Total Demand"].max()) + 5, 5), linewidth=0.7),
+        autolim=False,
+    )
     axes[0].legend(title="Sector + Total", loc="upper left", frameon=True, facecolor="white", framealpha=0.7)
 
     # --- Right: Offtake by Region ---
     df_pivot_offtake.plot(kind="bar", stacked=True, ax=axes[1], colormap="tab20")
-    for y in range(20, 101, 20):
-        axes[1].axhline(y, color="gray", linestyle="--", linewidth=0.8, alpha=0.7)
+    axes[1].add_collection(
+        _hline_collection(axes[1], np.arange(20, 101, 20), linewidth=0.8),
+        autolim=False,
+    )
     axes[1].set_title("Regional Distribution of Hydrogen Producers vs Consumers (2020–2025)")
     axes[1].set_ylabel("Share of Global Offtake Agreements (%)")
     axes[1].tick_params(axis="x", rotation=0)
     axes[1].legend(title="Region", loc="upper left", frameon=True, facecolor="white", framealpha=0.7)
 
-    plt.tight_layout()
-    plt.show()
+    fig.tight_layout()
+    _save_figure(fig, out_path)
 
 
 # ---------------------------------------------------------------------------
 # 3. Oil Refining Demand
 # ---------------------------------------------------------------------------
-def plot_refining_demand(filepath: str) -> None:
+def plot_refining_demand(filepath: str, out_path: str) -> None:
     """Show hydrogen demand in oil refining, split by technology and region."""
-    df = pd.read_csv(filepath)
+    _use_plot_style()
+    df = read_table(
+        filepath,
+        engine="pyarrow",
+        usecols=["year", "technology", "region", "value (ktpa H_2)"],
+        dtype={"year": "int16", "technology": "category", "region": "category", "value (ktpa H_2)": "float32"},
+    )
     df = df[(df["year"] >= 2021) & (df["year"] <= 2030)]
     technologies = df["technology"].unique()
 
+    # One groupby over all technologies instead of a masked pivot per technology
+    grouped = df.groupby(["technology", "year", "region"], observed=True)["value (ktpa H_2)"].sum()
+
     fig, axes = plt.subplots(1, len(technologies), figsize=(14, 6), sharey=True)
     for i, tech in enumerate(technologies):
-        df_tech = df[df["technology"] == tech]
-        pivot = df_tech.pivot_table(index="year", columns="region", values="value (ktpa H_2)", aggfunc="sum").fillna(0)
+        pivot = grouped.xs(tech, level="technology").unstack("region", fill_value=0).sort_index(axis=1)
         pivot.plot(kind="area", stacked=True, ax=axes[i], alpha=0.8)
         axes[i].set_title(f"{tech} – Regional Breakdown (2021–2030)")
         axes[i].set_xlabel("Year")
         axes[i].set_ylabel("Capacity (ktpa H₂)")
         axes[i].grid(True, axis="y", linestyle="--", alpha=0.7)
 
-    plt.tight_layout()
-    plt.show()
+    fig.tight_layout()
+    _save_figure(fig, out_path)
 
 
 # ---------------------------------------------------------------------------
 # 4. Industrial Demand
 # ---------------------------------------------------------------------------
-def plot_industrial_demand(filepath: str) -> None:
+def plot_industrial_demand(filepath: str, out_path: str) -> None:
     """Visualize hydrogen demand in industrial applications by technology and sector."""
-    df = pd.read_csv(filepath)
+    _use_plot_style()
+    df = read_table(
+        filepath,
+        engine="pyarrow",
+        usecols=["year", "technology", "sector", "production (ktpa H_2)"],
+        dtype={"year": "int16", "technology": "category", "sector": "category", "production (ktpa H_2)": "float32"},
+    )
     df = df[(df["year"] >= 2021) & (df["year"] <= 2030)]
     technologies = df["technology"].unique()
 
+    # One groupby over all technologies instead of a masked pivot per technology
+    grouped = df.groupby(["technology", "year", "sector"], observed=True)["production (ktpa H_2)"].sum()
+
     fig, axes = plt.subplots(1, len(technologies), figsize=(14, 6), sharey=True)
     for i, tech in enumerate(technologies):
-        df_tech = df[df["technology"] == tech]
-        pivot = df_tech.pivot_table(index="year", columns="sector", values="production (ktpa H_2)", aggfunc="sum").fillna(0)
+        pivot = grouped.xs(tech, level="technology").unstack("sector", fill_value=0).sort_index(axis=1)
         pivot.plot(kind="area", stacked=True, ax=axes[i], alpha=0.8)
         axes[i].set_title(f"{tech} – Sector Breakdown (2021–2030)")
         axes[i].set_xlabel("Year")
         axes[i].set_ylabel("Production (ktpa H₂)")
         axes[i].grid(True, axis="y", linestyle="--", alpha=0.7)
 
-    plt.tight_layout()
-    plt.show()
+    fig.tight_layout()
+    _save_figure(fig, out_path)
 
 
 # ---------------------------------------------------------------------------
 # Main execution
 # ---------------------------------------------------------------------------
 if __name__ == "__main__":
-    plot_demand_by_region("Demand_by_Region.csv")
-    plot_demand_sector_and_offtake("Demand_by_Sector.csv", "Offtake_by_Region.csv")
-    plot_refining_demand("Hydrogen_Oil_Refine_Demand_Cleaned.csv")
-    plot_industrial_demand("Hydrogen_Industry_Demand.csv")
+    plot_demand_by_region("Demand_by_Region.csv", "Demand_by_Region.png")
+    plot_demand_sector_and_offtake("Demand_by_Sector.csv", "Offtake_by_Region.csv", "Demand_by_Sector_and_Offtake.png")
+    plot_refining_demand("Hydrogen_Oil_Refine_Demand_Cleaned.csv", "Hydrogen_Oil_Refine_Demand.png")
+    plot_industrial_demand("Hydrogen_Industry_Demand.csv", "Hydrogen_Industry_Demand.png")
 
     print("\n Demand analysis complete.")
@@ -8,11 +8,15 @@ Author: [Siddharta Adaikalaraj]
 Date: [06/10/2025]
 """
 
+import numpy as np
 import pandas as pd
+import matplotlib
+
+# Render off-screen; figures are written to disk rather than shown
+matplotlib.use("Agg")
 import matplotlib.pyplot as plt
-import seaborn as sns
-from matplotlib.patches import Patch
-from matplotlib.lines import Line2D
+
+from table_io import read_table
 
 
 # ---------------------------------------------------------------------------
@@ -20,20 +24,20 @@ from matplotlib.lines import Line2D
 # ---------------------------------------------------------------------------
 def load_and_clean_data(cost_path: str, price_path: str):
     """Load and preprocess cost and breakeven datasets."""
-    df_cost = pd.read_csv(cost_path)
-    df_price = pd.read_csv(price_path)
+    df_cost = read_table(cost_path, engine="pyarrow", usecols=["Country", "Value (€/kg)"])
+    df_price = read_table(price_path, engine="pyarrow", usecols=["Category", "Min-max (Eur/kg)"], dtype=str)
 
-    # Split Min-Max column and convert to numeric
+    # Split Min-Max column and convert to numeric in one pass
+    # (single values such as "2" keep Max empty)
     df_price[["Min", "Max"]] = (
         df_price["Min-max (Eur/kg)"]
-        .str.replace(",", ".")
-        .str.split("-", expand=True)
+        .str.replace(",", ".", regex=False)
+        .str.extract(r"^\s*([\d.]+)\s*(?:-\s*([\d.]+))?\s*$")
+        .astype(float)
     )
-    df_price["Min"] = df_price["Min"].astype(float)
-    df_price["Max"] = df_price["Max"].astype(float)
 
-    # Strip spaces and lowercase for consistency
-    df_price["Category"] = df_price["Category"].str.strip().str.title()
+    # Strip spaces and title-case for consistency; store as categorical
+    df_price["Category"] = df_price["Category"].str.strip().str.title().astype("category")
 
     return df_cost, df_price
 
@@ -41,15 +45,21 @@ def load_and_clean_data(cost_path: str, price_path: str):
 # ---------------------------------------------------------------------------
 # 2. Plot price comparison
 # ---------------------------------------------------------------------------
-def plot_price_comparison(df_cost: pd.DataFrame, df_price: pd.DataFrame):
-    """Plot hydrogen production costs with breakeven price ranges per sector."""
+def plot_price_comparison(df_cost: pd.DataFrame, df_price: pd.DataFrame, out_path: str):
+    """Plot hydrogen production costs with breakeven price ranges per sector and save to ``out_path``."""
+    # Plot-only dependencies are imported here so loading the data stays light
+    import seaborn as sns
+    from matplotlib.collections import LineCollection, PolyCollection
+    from matplotlib.lines import Line2D
+    from matplotlib.patches import Patch
+
     selected_countries = [
         "Germany", "France", "United Kingdom", "Spain", "Italy",
         "Netherlands", "Poland", "Sweden", "Norway", "Greece"
     ]
     df_cost_filtered = df_cost[df_cost["Country"].isin(selected_countries)]
 
-    plt.figure(figsize=(12, 6))
+    fig, ax = plt.subplots(figsize=(12, 6))
 
     # Define consistent color palette
     colors = {
@@ -59,17 +69,34 @@ def plot_price_comparison(df_cost: pd.DataFrame, df_price: pd.DataFrame):
     }
 
     # --- Breakeven price ranges (background) ---
-    for _, row in df_price.iterrows():
-        category = row["Category"].title()
-        if category == "Primary Steel Making":
-            plt.axhline(row["Min"], color="black", linestyle="-", linewidth=2.5, zorder=1)
-        elif row["Min"] != row["Max"]:
-            plt.axhspan(
-                row["Min"], row["Max"], 
-                alpha=0.4,
-                color=colors.get(category, "grey"), 
-                zorder=1
-            )
+    # Drawn as one collection each, spanning the full axes width like axhspan/axhline
+    mins = df_price["Min"].to_numpy(dtype=float)
+    maxs = df_price["Max"].to_numpy(dtype=float)
+    cats = df_price["Category"].to_numpy(dtype=object)
+
+    is_steel = cats == "Primary Steel Making"
+    is_range = ~is_steel & (mins != maxs) & ~np.isnan(maxs)
+
+    span_colors = [colors.get(category, "grey") for category in cats[is_range]]
+    spans = PolyCollection(
+        [[(0, mn), (1, mn), (1, mx), (0, mx)] for mn, mx in zip(mins[is_range], maxs[is_range])],
+        facecolors=span_colors,
+        edgecolors=span_colors,
+        alpha=0.4,
+        zorder=1,
+        transform=ax.get_yaxis_transform()
+    )
+    steel_lines = LineCollection(
+        [[(0, mn), (1, mn)] for mn in mins[is_steel]],
+        colors="black",
+        linestyles="-",
+        linewidths=2.5,
+        zorder=1,
+        transform=ax.get_yaxis_transform()
+    )
+    # Steel line first so the shaded ranges sit on top of it
+    ax.add_collection(steel_lines)
+    ax.add_collection(spans)
 
     # --- Boxplot for production costs ---
     sns.boxplot(
@@ -77,12 +104,13 @@ def plot_price_comparison(df_cost: pd.DataFrame, df_price: pd.DataFrame):
         y="Value (€/kg)",
         data=df_cost_filtered,
         showfliers=False,
-        zorder=2
+        zorder=2,
+        ax=ax
     )
 
-    plt.title("Hydrogen Production Costs vs. Sector Breakeven Price Ranges (Europe)")
-    plt.ylabel("Cost (€/kg H₂)")
-    plt.xticks(rotation=45, ha="right")
+    ax.set_title("Hydrogen Production Costs vs. Sector Breakeven Price Ranges (Europe)")
+    ax.set_ylabel("Cost (€/kg H₂)")
+    plt.setp(ax.get_xticklabels(), rotation=45, ha="right")
 
     # --- Custom legend ---
     legend_elements = [
@@ -92,15 +120,16 @@ def plot_price_comparison(df_cost: pd.DataFrame, df_price: pd.DataFrame):
         Patch(facecolor=colors["Heavy-Duty Trucks"], alpha=0.4, label="Heavy-Duty Trucks")
     ]
 
-    plt.legend(
+    ax.legend(
         handles=legend_elements,
         title="Breakeven Sectors",
         bbox_to_anchor=(1.05, 1),
         loc="upper left"
     )
 
-    plt.tight_layout()
-    plt.show()
+    fig.tight_layout()
+    fig.savefig(out_path, dpi=100, bbox_inches="tight")
+    plt.close(fig)
 
 
 # ---------------------------------------------------------------------------
@@ -111,6 +140,6 @@ if __name__ == "__main__":
         "Hydrogen_Production_Costs_Europe_Imputed.csv",
         "BreakevenPrice_Hydrogen_Europe_Cleaned.csv"
     )
-    plot_price_comparison(df_cost, df_price)
+    plot_price_comparison(df_cost, df_price, "Price_Comparison.png")
 
     print("\n Price analysis complete.")
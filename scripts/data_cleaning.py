@@ -10,113 +10,241 @@ Date: [06/10/2025]
 """
 
 import pandas as pd
+import csv
 import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from table_io import read_table, write_table
+
+# Rows parsed per read_csv chunk; bounds peak memory on large source files
+CHUNK_SIZE = 200_000
+
+# Explicit dtypes keep chunk-wise parsing consistent across chunks
+IEA_DTYPES = {
+    'Ref': str,
+    'Project name': str,
+    'Date online': 'float64'
+}
 
 # ---------------------------------------------------------------------------
 # Helper functions
 # ---------------------------------------------------------------------------
 
-def clean_iea_projects(filepath: str, output_path: str) -> pd.DataFrame:
+def clean_iea_projects(filepath: str, output_path: str, chunksize: int = CHUNK_SIZE) -> pd.DataFrame:
     """
     Clean IEA Hydrogen Projects dataset:
     - Removes confidential and empty entries
     - Drops irrelevant columns
     - Filters out projects missing a 'Date online' field
-    """
-    df = pd.read_csv(filepath, skiprows=2)
-    df = df[~df['Project name'].str.contains("confidential", case=False, na=False)]
-    df = df.dropna(how='all')
-    df = df.drop(columns=['Refs'], errors='ignore')
 
-    columns_to_drop = [
+    The file is read in chunks of ``chunksize`` rows and dropped columns are
+    never parsed, so rows are filtered before the full dataset is in memory.
+    """
+    columns_to_drop = {
+        'Refs',
         'Capacity_t CO₂ captured/y',
         'References',
         'Latitude',
         'Longitude'
-    ] + [f'Unnamed: {i}' for i in range(35, 40)]
-    df = df.drop(columns=columns_to_drop, errors='ignore')
+    } | {f'Unnamed: {i}' for i in range(35, 40)}
+
+    reader = pd.read_csv(
+        filepath,
+        skiprows=2,
+        chunksize=chunksize,
+        dtype=IEA_DTYPES,
+        usecols=lambda col: col not in columns_to_drop
+    )
+
+    def filtered_chunks():
+        for chunk in reader:
+            # Combine the row filters into one mask so each chunk is sliced once.
+            # A row with a 'Date online' value is never entirely empty, so that
+            # check also covers the all-NaN rows.
+            keep = ~chunk['Project name'].str.lower().str.contains("confidential", regex=False, na=False).to_numpy()
+            keep &= chunk['Date online'].notna().to_numpy()
+            yield chunk.loc[keep]
 
-    df = df.dropna(subset=['Date online'])
-    df.to_csv(output_path, index=False)
+    df = pd.concat(filtered_chunks())
+    write_table(df, output_path)
 
     print(f" Cleaned IEA Projects saved as: {output_path} | Shape: {df.shape}")
     return df
 
 
-def clean_europe_datasets(filepath: str, output_path: str) -> pd.DataFrame:
+def clean_europe_datasets(filepath: str, output_path: str, chunksize: int = CHUNK_SIZE) -> pd.DataFrame:
     """
     Clean European hydrogen datasets (Demand, Production Costs, Breakeven Price):
     - Uses correct header row (index 6)
-    - Removes empty columns and rows
+    - Removes empty columns and rows (rows are dropped per chunk while reading)
     """
-    df = pd.read_csv(filepath, header=6)
-    df = df.dropna(axis=1, how='all').dropna(how='all')
-    df.to_csv(output_path, index=False)
+    reader = pd.read_csv(filepath, header=6, chunksize=chunksize)
+    chunks = []
+    has_values = None
+    for chunk in reader:
+        # One NA mask per chunk serves both the row and the column check
+        na = chunk.isna().to_numpy()
+        chunk_has_values = ~na.all(axis=0)
+        has_values = chunk_has_values if has_values is None else has_values | chunk_has_values
+        chunks.append(chunk.iloc[~na.all(axis=1)])
+
+    # Column emptiness is only known once every chunk has been seen
+    df = pd.concat(chunks).iloc[:, has_values]
+    write_table(df, output_path)
 
     print(f" Cleaned {os.path.basename(filepath)} saved as: {output_path} | Shape: {df.shape}")
     return df
 
 
-def impute_cost_values(filepath: str, output_path: str) -> pd.DataFrame:
+def impute_cost_values(filepath: str, output_path: str, verbose: bool = False) -> pd.DataFrame:
     """
     Forward and backward fill missing hydrogen cost values.
+    Set ``verbose`` to report the remaining missing values per column.
     """
-    df = pd.read_csv(filepath)
-    df['Value (€/kg)'] = df['Value (€/kg)'].fillna(method='ffill').fillna(method='bfill')
-    df.to_csv(output_path, index=False)
+    df = read_table(filepath, engine='pyarrow')
+    df['Value (€/kg)'] = df['Value (€/kg)'].ffill().bfill()
+    write_table(df, output_path)
 
     print(f" Imputed missing values in {os.path.basename(filepath)} | Output: {output_path}")
-    print("Remaining missing values:\n", df.isnull().sum())
+    if verbose:
+        print("Remaining missing values:\n", df.isnull().sum())
     return df
 
 
-def update_north2_date(filepath: str, output_path: str) -> pd.DataFrame:
+def _rewrite_csv_rows(filepath: str, output_path: str, fix_row) -> None:
+    """
+    Stream ``filepath`` to ``output_path`` one row at a time.
+    ``fix_row(row, columns)`` edits each data row in place; ``columns`` maps
+    header names to positions. Short rows are padded to the header length
+    (as pandas fills them with NaN), blank lines and untouched rows are written
+    back verbatim. The output is written to a temporary file and moved into
+    place at the end, so a failure never leaves a truncated ``output_path``.
+    """
+    tmp_path = output_path + '.tmp'
+    try:
+        with open(filepath, newline='', encoding='utf-8-sig') as src, \
+                open(tmp_path, 'w', newline='', encoding='utf-8') as dst:
+            reader = csv.reader(src)
+            writer = csv.writer(dst, lineterminator=os.linesep)
+            header = next(reader)
+            writer.writerow(header)
+            columns = {name: i for i, name in enumerate(header)}
+            for row in reader:
+                if row:
+                    row.extend([''] * (len(header) - len(row)))
+                    fix_row(row, columns)
+                writer.writerow(row)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def update_north2_date(filepath: str, output_path: str, streaming: bool = True) -> Optional[pd.DataFrame]:
     """
     Fix missing commissioning date for the NortH2 project.
+    By default the file is edited as a stream without building a DataFrame
+    (returns None); ``streaming=False`` uses pandas and returns the frame.
     """
-    df = pd.read_csv(filepath)
-    df.loc[df['Project name'].str.contains("NortH2", case=False, na=False), 'Date online'] = 2020.0
-    df.to_csv(output_path, index=False)
+    if streaming:
+        def fix_row(row, columns):
+            if "north2" in row[columns['Project name']].lower():
+                row[columns['Date online']] = "2020.0"
+
+        _rewrite_csv_rows(filepath, output_path, fix_row)
+        df = None
+    else:
+        df = pd.read_csv(filepath, engine='pyarrow')
+        df.loc[df['Project name'].str.contains("NortH2", case=False, na=False), 'Date online'] = 2020.0
+        df.to_csv(output_path, index=False)
 
     print(f" Updated NortH2 entry in {output_path}")
     return df
 
 
-def update_refinery_region(filepath: str, output_path: str) -> pd.DataFrame:
+def update_refinery_region(filepath: str, output_path: str, streaming: bool = True) -> Optional[pd.DataFrame]:
     """
     Ensure correct region label for 2030 electrolysis projects in refining demand data.
+    By default the file is edited as a stream without building a DataFrame
+    (returns None); ``streaming=False`` uses pandas and returns the frame.
     """
-    df = pd.read_csv(filepath)
-    mask = (
-        (df['year'] == 2030) &
-        (df['technology'] == "Electrolysis") &
-        (df['status'] == "Operational")
-    )
-    df.loc[mask, 'region'] = "Global"
-    df.to_csv(output_path, index=False)
+    if streaming:
+        def fix_row(row, columns):
+            try:
+                is_2030 = float(row[columns['year']]) == 2030
+            except ValueError:
+                is_2030 = False
+            if (
+                is_2030 and
+                row[columns['technology']] == "Electrolysis" and
+                row[columns['status']] == "Operational"
+            ):
+                row[columns['region']] = "Global"
+
+        _rewrite_csv_rows(filepath, output_path, fix_row)
+        df = None
+    else:
+        df = pd.read_csv(filepath, engine='pyarrow')
+        mask = (
+            (df['year'] == 2030) &
+            (df['technology'] == "Electrolysis") &
+            (df['status'] == "Operational")
+        )
+        df.loc[mask, 'region'] = "Global"
+        df.to_csv(output_path, index=False)
 
     print(f"[✔] Updated refinery region data saved to {output_path}")
     return df
 
+
+def run_step(step, *args) -> None:
+    """
+    Run a cleaning step in a worker process and discard its DataFrame,
+    so the result is not pickled back to the parent only to be thrown away.
+    """
+    step(*args)
+
 # ---------------------------------------------------------------------------
 # Main workflow
 # ---------------------------------------------------------------------------
 
 if __name__ == "__main__":
 
-    # === 1. Clean Hydrogen Projects (IEA) ===
-    clean_iea_projects("HydrogenProjects_IEA_Ori.csv", "HydrogenProjects_Final.csv")
-
-    # === 2. Clean European Datasets ===
-    clean_europe_datasets("Europe_Hydrogen_Demand.csv", "Europe_Hydrogen_Demand_Cleaned.csv")
-    clean_europe_datasets("Hydrogen_Production_Costs_Europe.csv", "Hydrogen_Production_Costs_Europe_Cleaned.csv")
-    clean_europe_datasets("BreakevenPrice_Hydrogen_Europe.csv", "BreakevenPrice_Hydrogen_Europe_Cleaned.csv")
-
-    # === 3. Impute Missing Values ===
-    impute_cost_values("Hydrogen_Production_Costs_Europe_Cleaned.csv", "Hydrogen_Production_Costs_Europe_Imputed.csv")
-
-    # === 4. Update Specific Project Entries ===
-    update_north2_date("HydrogenProjects_Supply.csv", "HydrogenProjects_Supply_Updated.csv")
-    update_refinery_region("Hydrogen_Oil_Refine_Demand.csv", "Hydrogen_Oil_Refine_Demand_Updated.csv")
+    # Every step reads and writes its own files, so they run in separate processes.
+    # Only the imputation has to wait, for the cleaned production cost dataset.
+    with ProcessPoolExecutor(max_workers=6) as executor:
+
+        # === 1. Clean Hydrogen Projects (IEA) ===
+        futures = [
+            executor.submit(run_step, clean_iea_projects, "HydrogenProjects_IEA_Ori.csv", "HydrogenProjects_Final.csv")
+        ]
+
+        # === 2. Clean European Datasets ===
+        costs_cleaned = executor.submit(
+            run_step, clean_europe_datasets, "Hydrogen_Production_Costs_Europe.csv", "Hydrogen_Production_Costs_Europe_Cleaned.csv"
+        )
+        futures += [
+            costs_cleaned,
+            executor.submit(run_step, clean_europe_datasets, "Europe_Hydrogen_Demand.csv", "Europe_Hydrogen_Demand_Cleaned.csv"),
+            executor.submit(run_step, clean_europe_datasets, "BreakevenPrice_Hydrogen_Europe.csv", "BreakevenPrice_Hydrogen_Europe_Cleaned.csv")
+        ]
+
+        # === 3. Update Specific Project Entries ===
+        futures += [
+            executor.submit(run_step, update_north2_date, "HydrogenProjects_Supply.csv", "HydrogenProjects_Supply_Updated.csv"),
+            executor.submit(run_step, update_refinery_region, "Hydrogen_Oil_Refine_Demand.csv", "Hydrogen_Oil_Refine_Demand_Updated.csv")
+        ]
+
+        # === 4. Impute Missing Values ===
+        costs_cleaned.result()
+        futures.append(
+            executor.submit(run_step, impute_cost_values, "Hydrogen_Production_Costs_Europe_Cleaned.csv", "Hydrogen_Production_Costs_Europe_Imputed.csv")
+        )
+
+        # Re-raise the first failure, if any
+        for future in futures:
+            future.result()
 
     print("\n All datasets cleaned and updated successfully.")
@@ -0,0 +1,66 @@
+"""
+table_io.py
+-----------
+Shared CSV/Parquet helpers for the cleaning and analysis scripts.
+Cleaned datasets are written as CSV plus a Parquet copy next to it;
+readers prefer the Parquet copy while it is at least as new as the CSV.
+
+Author: [Siddharta Adaikalaraj]
+Date: [06/10/2025]
+"""
+
+import os
+
+import pandas as pd
+
+
+def parquet_path(csv_path: str) -> str:
+    """Return the Parquet cache path that sits next to ``csv_path``."""
+    return os.path.splitext(csv_path)[0] + ".parquet"
+
+
+def _parquet_safe(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cast object columns holding mixed value types (e.g. numbers from one
+    read chunk and text from another) to strings, as a single CSV read
+    would have inferred them; Arrow cannot store mixed columns.
+    """
+    mixed = [
+        col for col in df.columns[df.dtypes == object]
+        if pd.api.types.infer_dtype(df[col], skipna=True).startswith("mixed")
+    ]
+    return df.astype({col: "string" for col in mixed}) if mixed else df
+
+
+def write_table(df: pd.DataFrame, output_path: str) -> None:
+    """
+    Write ``df`` to ``output_path`` as CSV and to its Parquet cache.
+    The cache is written to a temporary file and moved into place; if that
+    fails, any existing cache is removed so readers fall back to the new CSV.
+    """
+    df.to_csv(output_path, index=False)
+
+    cache = parquet_path(output_path)
+    tmp_cache = cache + ".tmp"
+    try:
+        _parquet_safe(df).to_parquet(tmp_cache, engine="pyarrow", compression="zstd", index=False)
+        os.replace(tmp_cache, cache)
+    except Exception:
+        for stale in (tmp_cache, cache):
+            if os.path.exists(stale):
+                os.remove(stale)
+        raise
+
+
+def read_table(filepath: str, usecols=None, dtype=None, **read_csv_kwargs) -> pd.DataFrame:
+    """
+    Load a dataset, preferring its Parquet cache over the CSV.
+    The cache is skipped when missing or older than the CSV; ``usecols`` and
+    ``dtype`` apply to both paths, other keyword arguments go to ``read_csv``.
+    """
+    cache = parquet_path(filepath)
+    if os.path.exists(cache) and os.path.getmtime(cache) >= os.path.getmtime(filepath):
+        df = pd.read_parquet(cache, engine="pyarrow", columns=usecols)
+        return df.astype(dtype) if dtype is not None else df
+
+    return pd.read_csv(filepath, usecols=usecols, dtype=dtype, **read_csv_kwargs)
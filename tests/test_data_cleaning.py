@@ -0,0 +1,79 @@
+"""
+test_data_cleaning.py
+---------------------
+Tests for the streaming CSV rewrites in data_cleaning.py.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "scripts"))
+
+from data_cleaning import update_north2_date, update_refinery_region  # noqa: E402
+
+
+def _read_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+def test_update_north2_date_handles_blank_and_short_rows(tmp_path):
+    src = tmp_path / "supply.csv"
+    src.write_text(
+        "Ref,Project name,Date online\n"
+        "1,NortH2,\n"
+        "\n"
+        "2,Other\n"
+        "3,north2 phase 2\n",
+        encoding="utf-8",
+    )
+    out = tmp_path / "supply_updated.csv"
+
+    update_north2_date(str(src), str(out))
+
+    assert _read_lines(out) == [
+        "Ref,Project name,Date online",
+        "1,NortH2,2020.0",
+        "",
+        "2,Other,",
+        "3,north2 phase 2,2020.0",
+    ]
+
+
+def test_update_refinery_region_handles_blank_and_short_rows(tmp_path):
+    src = tmp_path / "refine.csv"
+    src.write_text(
+        "year,technology,status,region\n"
+        "\n"
+        "2030\n"
+        "2030,Electrolysis,Operational\n"
+        "2025,Electrolysis,Operational,Europe\n",
+        encoding="utf-8",
+    )
+    out = tmp_path / "refine_updated.csv"
+
+    update_refinery_region(str(src), str(out))
+
+    assert _read_lines(out) == [
+        "year,technology,status,region",
+        "",
+        "2030,,,",
+        "2030,Electrolysis,Operational,Global",
+        "2025,Electrolysis,Operational,Europe",
+    ]
+
+
+def test_failed_rewrite_leaves_existing_output(tmp_path):
+    src = tmp_path / "supply.csv"
+    src.write_text("Ref,Name\n1,NortH2\n", encoding="utf-8")
+    out = tmp_path / "supply_updated.csv"
+    out.write_text("previous\n", encoding="utf-8")
+
+    # No 'Project name' column, so the row fix raises part-way through
+    with pytest.raises(KeyError):
+        update_north2_date(str(src), str(out))
+
+    assert _read_lines(out) == ["previous"]
+    assert sorted(os.listdir(tmp_path)) == ["supply.csv", "supply_updated.csv"]